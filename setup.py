@@ -27,6 +27,7 @@ setup(name="paperetl",
           "lxml>=4.5.0",
           "nltk>=3.5",
           "numpy>=1.18.4",
+          "orjson>=3.4.0",
           "python-dateutil>=2.8.1",
           "PyYAML>=5.3",
           "regex>=2020.5.14",
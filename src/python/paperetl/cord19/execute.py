@@ -4,11 +4,13 @@ Transforms and loads CORD-19 data into an articles database.
 
 import csv
 import hashlib
+import multiprocessing
 import os.path
 import re
+import sys
 
 from datetime import datetime
-from multiprocessing import Pool
+from functools import lru_cache, partial
 from dateutil import parser
 
 from ..analysis import Study
@@ -21,6 +23,16 @@ from .section import Section
 # pylint: disable=W0603
 GRAMMAR = None
 
+# Compiled pattern for tagging articles
+TAGS = None
+
+# Title hashes aren't used for security, flag as such where supported (Python 3.9+) to skip FIPS checks
+try:
+    SHA1 = partial(hashlib.sha1, usedforsecurity=False)
+    SHA1()
+except TypeError:
+    SHA1 = hashlib.sha1
+
 def getGrammar():
     """
     Multiprocessing helper method. Gets (or first creates then gets) a global grammar object to
@@ -37,11 +49,40 @@ def getGrammar():
 
     return GRAMMAR
 
+def getTagsPattern():
+    """
+    Gets or builds a pre-compiled regex for matching COVID-19 keywords.
+
+    Returns:
+        compiled regex
+    """
+
+    global TAGS
+
+    if not TAGS:
+        # Keyword patterns to search for
+        keywords = [r"2019[\-\s]?n[\-\s]?cov", "2019 novel coronavirus", "coronavirus 2(?:019)?", r"coronavirus disease (?:20)?19",
+                    r"covid(?:[\-\s]?(?:20)?19)?", r"n\s?cov[\-\s]?2019", r"sars[\-\s]cov-?2", r"wuhan (?:coronavirus|cov|pneumonia)"]
+
+        # Build regular expression for each keyword. Wrap term in word boundaries
+        TAGS = re.compile("|".join(["\\b%s\\b" % keyword for keyword in keywords]), re.IGNORECASE)
+
+    return TAGS
+
 class Execute(object):
     """
     Transforms and loads CORD-19 data into an articles database.
     """
 
+    # Minimum number of rows required to process rows in parallel
+    MIN_PARALLEL = 500
+
+    # Maximum number of rows sent to a worker at once
+    MAX_CHUNKSIZE = 100
+
+    # Read buffer size for CSV files
+    BUFFER = 1 << 20
+
     @staticmethod
     def getHash(row):
         """
@@ -54,14 +95,29 @@ class Execute(object):
             sha1 hash id
         """
 
-        # Use sha1 provided, if available
-        sha = row["sha"].split("; ")[0] if row["sha"] else None
+        # Use first sha1 provided, if available
+        sha = row["sha"].partition("; ")[0]
         if not sha:
             # Fallback to sha1 of title
-            sha = hashlib.sha1(row["title"].encode("utf-8")).hexdigest()
+            sha = Execute.getTitleHash(row["title"])
 
         return sha
 
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def getTitleHash(title):
+        """
+        Builds a sha1 hash for a title. Results are cached as titles repeat across preprint/published pairs.
+
+        Args:
+            title: article title
+
+        Returns:
+            sha1 hash
+        """
+
+        return SHA1(title.encode("utf-8")).hexdigest()
+
     @staticmethod
     def getDate(row):
         """
@@ -91,6 +147,21 @@ class Execute(object):
 
         return None
 
+    @staticmethod
+    def isRecent(date):
+        """
+        Determines if an article is recent enough to search for COVID-19 keywords. Articles without
+        a publish date are considered recent.
+
+        Args:
+            date: publish date
+
+        Returns:
+            True if article is recent, False otherwise
+        """
+
+        return not date or date >= datetime(2019, 7, 1)
+
     @staticmethod
     def getUrl(row):
         """
@@ -104,10 +175,10 @@ class Execute(object):
         """
 
         if row["url"]:
-            # Filter out API reference links
-            urls = [url for url in row["url"].split("; ") if "https://api." not in url]
-            if urls:
-                return urls[0]
+            # Return first url that isn't an API reference link
+            url = next((url for url in row["url"].split("; ") if "https://api." not in url), None)
+            if url is not None:
+                return url
 
         # Default to DOI
         return "https://doi.org/"  + row["doi"]
@@ -124,38 +195,36 @@ class Execute(object):
             tags
         """
 
-        # Keyword patterns to search for
-        keywords = [r"2019[\-\s]?n[\-\s]?cov", "2019 novel coronavirus", "coronavirus 2(?:019)?", r"coronavirus disease (?:20)?19",
-                    r"covid(?:[\-\s]?(?:20)?19)?", r"n\s?cov[\-\s]?2019", r"sars[\-\s]cov-?2", r"wuhan (?:coronavirus|cov|pneumonia)"]
-
-        # Build regular expression for each keyword. Wrap term in word boundaries
-        regex = "|".join(["\\b%s\\b" % keyword.lower() for keyword in keywords])
+        # Compiled keyword pattern
+        pattern = getTagsPattern()
 
         tags = None
         for _, text in sections:
             # Look for at least one keyword match
-            if re.findall(regex, text.lower()):
+            if pattern.search(text):
                 tags = "COVID-19"
                 break
 
         return tags
 
     @staticmethod
-    def stream(indir, models, dates, merge):
+    def stream(indir, models, dates, merge, full):
         """
-        Generator that yields rows from a metadata.csv file. The directory is also included.
+        Generator that yields rows from a metadata.csv file. The directory, models directory, entry date and
+        published date are also included.
 
         Args:
             indir: input directory
             models: models directory
             dates: list of uid - entry dates for current metadata file
             merge: only merges/processes this list of uids, if enabled
+            full: full database load if True, otherwise skips rows that can't be tagged
         """
 
         # Filter out duplicate ids
         ids, hashes = set(), set()
 
-        with open(os.path.join(indir, "metadata.csv"), mode="r") as csvfile:
+        with open(os.path.join(indir, "metadata.csv"), mode="r", buffering=Execute.BUFFER) as csvfile:
             for row in csv.DictReader(csvfile):
                 # cord uid
                 uid = row["cord_uid"]
@@ -168,7 +237,12 @@ class Execute(object):
                 #  - cord uid in entry date mapping
                 #  - cord uid and sha hash not already processed
                 if (not merge or uid in merge) and uid in dates and uid not in ids and sha not in hashes:
-                    yield (row, indir, models)
+                    # Published date, parsed once and passed to process
+                    date = Execute.getDate(row)
+
+                    # Skip rows too old to be tagged unless this is a full database load
+                    if full or Execute.isRecent(date):
+                        yield (row, indir, models, dates[uid], date)
 
                 # Add uid and sha as processed
                 ids.add(uid)
@@ -180,7 +254,7 @@ class Execute(object):
         Processes a single row
 
         Args:
-            params: (row, indir, models)
+            params: (row, indir, models, entry date, published date)
 
         Returns:
             (id, article, sections)
@@ -190,16 +264,13 @@ class Execute(object):
         grammar = getGrammar()
 
         # Unpack parameters
-        row, indir, models = params
-
-        # Published date
-        date = Execute.getDate(row)
+        row, indir, models, entry, date = params
 
         # Get text sections
         sections = Section.parse(row, indir)
 
         # Search recent documents for COVID-19 keywords
-        tags = Execute.getTags(sections) if not date or date >= datetime(2019, 7, 1) else None
+        tags = Execute.getTags(sections) if Execute.isRecent(date) else None
 
         if tags:
             # Build NLP tokens for sections
@@ -221,12 +292,46 @@ class Execute(object):
             sections = [(name, text, None) for name, text in sections]
 
         # Article metadata - id, source, published, publication, authors, title, tags, design, sample size
-        #                    sample section, sample method, reference
+        #                    sample section, sample method, reference, entry date
         metadata = (row["cord_uid"], row["source_x"], date, row["journal"], row["authors"], row["title"], tags, design, size,
-                    sample, method, Execute.getUrl(row))
+                    sample, method, Execute.getUrl(row), entry)
 
         return Article(metadata, sections, None)
 
+    @staticmethod
+    def execute(rows, total):
+        """
+        Generator that processes rows and yields articles in input order. Small inputs are processed in the
+        current process, larger inputs are distributed across a process pool.
+
+        Args:
+            rows: input rows
+            total: upper bound on number of rows
+
+        Returns:
+            articles
+        """
+
+        if total < Execute.MIN_PARALLEL:
+            # Process startup and pickling overhead outweighs any gains for small inputs
+            for params in rows:
+                yield Execute.process(params)
+        else:
+            # Number of CPUs available to this process
+            workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+
+            # Fork workers where supported to avoid re-importing modules in each process
+            context = multiprocessing.get_context("fork" if sys.platform != "win32" else "spawn")
+
+            # Size chunks so each worker receives around 4 chunks, which amortizes pickling overhead. Chunks are
+            # capped as results are returned in order and nothing is saved until the first chunk completes.
+            chunksize = min(max(1, total // (workers * 4)), Execute.MAX_CHUNKSIZE)
+
+            # Load grammar when each worker starts to keep model warmup out of the first chunk
+            with context.Pool(workers, getGrammar) as pool:
+                for article in pool.imap(Execute.process, rows, chunksize):
+                    yield article
+
     @staticmethod
     def entryDates(indir, entryfile):
         """
@@ -247,15 +352,22 @@ class Execute(object):
         if not entryfile:
             entryfile = os.path.join(indir, "entry-dates.csv")
 
-            
         # Load in memory date lookup
-        with open(entryfile, mode="r") as csvfile:
-            for row in csv.DictReader(csvfile):
-                entries[row["sha"]] = (row["cord_uid"], row["date"])
+        with open(entryfile, mode="r", buffering=Execute.BUFFER) as csvfile:
+            reader = csv.reader(csvfile)
+
+            # Resolve column positions from header, avoids building a dict per row
+            header = next(reader)
+            shacol, uidcol, datecol = header.index("sha"), header.index("cord_uid"), header.index("date")
+
+            for row in reader:
+                # Skip blank lines, same as DictReader
+                if row:
+                    entries[row[shacol]] = (row[uidcol], row[datecol])
 
         # Reduce down to entries only in metadata
         dates = {}
-        with open(os.path.join(indir, "metadata.csv"), mode="r") as csvfile:
+        with open(os.path.join(indir, "metadata.csv"), mode="r", buffering=Execute.BUFFER) as csvfile:
             for row in csv.DictReader(csvfile):
                 # Lookup hash
                 sha = Execute.getHash(row)
@@ -302,19 +414,13 @@ class Execute(object):
             merge = db.merge(merge, dates)
             print("Merged results from existing articles database")
 
-        # Create process pool
-        with Pool(os.cpu_count()) as pool:
-            for article in pool.imap(Execute.process, Execute.stream(indir, models, dates, merge), 100):
-                # Get unique id
-                uid = article.uid()
-
-                # Only load untagged rows if this is a full database load
-                if full or article.tags():
-                    # Append entry date
-                    article.metadata = article.metadata + (dates[uid],)
+        # Upper bound on number of rows to process
+        total = len(merge) if merge else len(dates)
 
-                    # Save article
-                    db.save(article)
+        for article in Execute.execute(Execute.stream(indir, models, dates, merge, full), total):
+            # Only load untagged rows if this is a full database load
+            if full or article.tags():
+                db.save(article)
 
         # Complete processing
         db.complete()
@@ -4,7 +4,10 @@ Section module
 
 import json
 import os
-import re
+
+from functools import lru_cache
+
+import orjson
 
 from nltk.tokenize import sent_tokenize
 
@@ -16,6 +19,13 @@ class Section(object):
     Parses text content from JSON file sections.
     """
 
+    # Boilerplate text to ignore, all entries must contain BOILERPLATE_KEY
+    BOILERPLATE = ["COVID-19 resource centre", "permission to make all its COVID", "WHO COVID database",
+                   "COVID-19 public health emergency response"]
+
+    # Substring common to all boilerplate text
+    BOILERPLATE_KEY = "COVID"
+
     @staticmethod
     def parse(row, directory):
         """
@@ -36,27 +46,29 @@ class Section(object):
             text = row[name]
             if text:
                 # Remove leading and trailing []
-                text = re.sub(r"^\[", "", text)
-                text = re.sub(r"\]$", "", text)
-
-                # Transform and clean text
-                text = Text.transform(text)
-
-                sections.extend([(name.upper(), x) for x in sent_tokenize(text)])
-
-        # Process each JSON file
-        for path in Section.files(row):
-            # Build article path
-            article = os.path.join(directory, path)
-
+                if text.startswith("["):
+                    text = text[1:]
+                if text.endswith("]"):
+                    text = text[:-1]
+                elif text.endswith("]\n"):
+                    # Match regex $ semantics, which also matches before a trailing newline
+                    text = text[:-2] + "\n"
+
+                # Transform text and split into sentences
+                upper = name.upper()
+                sections.extend([(upper, x) for x in Section.sentences(text)])
+
+        # Process each JSON file, later files are read in the background while earlier files are parsed
+        for article, jfile in Section.prefetch(Section.files(row, directory)):
             try:
-                with open(article) as jfile:
-                    data = json.load(jfile)
+                with jfile:
+                    data = Section.load(jfile.read())
 
                     # Extract text from body
                     for section in data["body_text"]:
                         # Section name and text
-                        name = section["section"].upper() if len(section["section"].strip()) > 0 else None
+                        name = section["section"]
+                        name = name.upper() if name and not name.isspace() else None
                         text = section["text"].replace("\n", " ")
 
                         # Clean and transform text
@@ -78,25 +90,89 @@ class Section(object):
         return Section.filtered(sections)
 
     @staticmethod
-    def files(row):
+    @lru_cache(maxsize=8192)
+    def sentences(text):
+        """
+        Cleans and transforms text then splits it into sentences. Used for titles and abstracts, results are
+        cached as the same title and abstract frequently repeat across preprint/published versions.
+
+        Args:
+            text: input text
+
+        Returns:
+            tuple of sentences
+        """
+
+        return tuple(sent_tokenize(Text.transform(text)))
+
+    @staticmethod
+    def load(data):
+        """
+        Parses JSON content. Uses orjson and falls back to the standard json module for content orjson rejects,
+        such as lone surrogate escapes which are common in PDF extracted text.
+
+        Args:
+            data: JSON bytes
+
+        Returns:
+            parsed JSON object
+        """
+
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+
+    @staticmethod
+    def files(row, directory):
         """
-        Build a list of json file paths to parse.
+        Generator that yields json file paths to parse.
 
         Args:
             row: input row
+            directory: input directory
 
         Returns:
-            list of paths
+            paths
         """
 
-        paths = []
+        # Directory prefix, concatenated with each path instead of calling os.path.join per file
+        prefix = directory if not directory or directory.endswith(("/", os.sep)) else directory + os.sep
 
-        # Build list of documents to parse
+        # Yield full path for each document in each column, partition avoids building intermediate lists
         for column in ["pdf_json_files", "pmc_json_files"]:
-            if row[column]:
-                paths.extend(row[column].split("; "))
+            paths = row[column]
+            while paths:
+                path, _, paths = paths.partition("; ")
+                yield prefix + path
+
+    @staticmethod
+    def prefetch(paths):
+        """
+        Opens all files up front. Each file after the first is hinted to the operating system for asynchronous
+        read ahead, where posix_fadvise is supported. Files are opened in binary mode with a large buffer, orjson
+        decodes UTF-8 directly.
+
+        Args:
+            paths: file paths
+
+        Returns:
+            list of (path, open file)
+        """
+
+        files = []
+        for path in paths:
+            try:
+                jfile = open(path, "rb", buffering=1 << 20)
+                files.append((path, jfile))
+
+                # First file is read immediately, read ahead remaining files using the open file descriptor
+                if len(files) > 1 and hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(jfile.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            except OSError as ex:
+                print("Error processing text file: {}".format(path), ex)
 
-        return paths
+        return files
 
     @staticmethod
     def filtered(sections):
@@ -110,18 +186,27 @@ class Section(object):
             filtered list of sections
         """
 
-        # Use list to preserve insertion order
-        unique = []
-        keys = set()
-
-        # Boilerplate text to ignore
-        boilerplate = ["COVID-19 resource centre", "permission to make all its COVID", "WHO COVID database",
-                       "COVID-19 public health emergency response"]
+        # Dict of text -> name, preserves insertion order
+        unique = {}
 
         for name, text in sections:
             # Add unique text that isn't boilerplate text
-            if not text in keys and not any([x in text for x in boilerplate]):
-                unique.append((name, text))
-                keys.add(text)
+            if text not in unique and not Section.isBoilerplate(text):
+                unique[text] = name
+
+        return [(name, text) for text, name in unique.items()]
+
+    @staticmethod
+    def isBoilerplate(text):
+        """
+        Determines if text contains boilerplate text.
+
+        Args:
+            text: input text
+
+        Returns:
+            True if text contains boilerplate text, False otherwise
+        """
 
-        return unique
+        # Single scan for the common substring rules out almost all text before checking each entry
+        return Section.BOILERPLATE_KEY in text and any(x in text for x in Section.BOILERPLATE)
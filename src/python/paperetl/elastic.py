@@ -2,6 +2,9 @@
 Elasticsearch module
 """
 
+from queue import Queue
+from threading import Thread
+
 from elasticsearch import Elasticsearch, helpers
 
 from .database import Database
@@ -39,14 +42,36 @@ class Elastic(Database):
         # Row count
         self.rows = 0
 
-        # Buffered actions
-        self.buffer = []
-
         # Create index if it doesn't exist
         if not self.connection.indices.exists("articles"):
             self.connection.indices.create("articles", Elastic.ARTICLES)
 
+        # Queued actions, bounded to apply back pressure when indexing falls behind
+        self.queue = Queue(maxsize=10000)
+
+        # Indexing error raised in background thread, if any
+        self.error = None
+
+        # Set when indexing fails, stops reading queued articles
+        self.stop = False
+
+        # Set when the end of input has been read from the queue
+        self.done = False
+
+        # Background indexing thread, started on first save so worker processes aren't forked from a
+        # multithreaded process
+        self.thread = None
+
     def save(self, article):
+        # Raise indexing errors detected by the background thread, checked as each bulk chunk completes
+        if self.error:
+            raise self.error
+
+        # Start background indexing thread
+        if not self.thread:
+            self.thread = Thread(target=self.index, daemon=True)
+            self.thread.start()
+
         # Build article
         article = article.build()
 
@@ -54,23 +79,23 @@ class Elastic(Database):
         article["_id"] = article["id"]
         article["_index"] = "articles"
 
-        # Buffer article
-        self.buffer.append(article)
+        # Queue article for indexing
+        self.queue.put(article)
 
         # Increment number of articles processed
         self.rows += 1
 
-        # Bulk load every 1000 records
         if self.rows % 1000 == 0:
-            helpers.bulk(self.connection, self.buffer)
-            self.buffer = []
-
-            print("Inserted {} articles".format(self.rows), end="\r")
+            print("Queued {} articles".format(self.rows), end="\r")
 
     def complete(self):
-        # Load remaining buffered articles
-        if self.buffer:
-            helpers.bulk(self.connection, self.buffer)
+        # Signal end of input and wait for remaining queued articles to load
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join()
+
+        if self.error:
+            raise self.error
 
         print("Total articles inserted: {}".format(self.rows))
 
@@ -79,3 +104,43 @@ class Elastic(Database):
 
     def close(self):
         self.connection.close()
+
+    def index(self):
+        """
+        Background thread that bulk loads queued articles using parallel bulk requests.
+        """
+
+        try:
+            # Check each result as chunks complete, so failures are detected while articles are still being saved
+            for success, info in helpers.parallel_bulk(self.connection, self.actions(), thread_count=4, chunk_size=1000,
+                                                       queue_size=8, raise_on_error=False):
+                if not success and not self.error:
+                    self.error = helpers.BulkIndexError("Failed to index article", [info])
+                    self.stop = True
+
+        # pylint: disable=W0703
+        except Exception as ex:
+            if not self.error:
+                self.error = ex
+
+        # Drain queue so producers don't block
+        self.stop = True
+        while not self.done:
+            if self.queue.get() is None:
+                self.done = True
+
+    def actions(self):
+        """
+        Generator that yields queued articles until the end of input is signaled or indexing fails.
+
+        Returns:
+            bulk actions
+        """
+
+        while not self.stop:
+            article = self.queue.get()
+            if article is None:
+                self.done = True
+                return
+
+            yield article
@@ -2,6 +2,21 @@
 Article module.
 """
 
+def builder(fields):
+    """
+    Generates a function that converts a tuple into a dict keyed by fields. The function uses a dict literal
+    which is considerably faster than dict(zip(fields, values)) for the fixed schemas below.
+
+    Args:
+        fields: tuple of field names
+
+    Returns:
+        function that takes a values tuple and returns a dict
+    """
+
+    # pylint: disable=W0123
+    return eval("lambda values: {%s}" % ", ".join(["%r: values[%d]" % (field, x) for x, field in enumerate(fields)]))
+
 class Article(object):
     """
     Article objects. Holds all metadata and text content related to an article.
@@ -14,6 +29,10 @@ class Article(object):
     # Sections schema
     SECTION = ("name", "text", "labels")
 
+    # Generated dict builders for each schema
+    BUILD_ARTICLE = staticmethod(builder(ARTICLE))
+    BUILD_SECTION = staticmethod(builder(SECTION))
+
     def __init__(self, metadata, sections, source):
         """
         Stores article metadata and section content as an object.
@@ -67,10 +86,10 @@ class Article(object):
         """
 
         # Create article
-        article = dict(zip(Article.ARTICLE, self.metadata))
+        article = Article.BUILD_ARTICLE(self.metadata)
 
         # Create sections
-        sections = [dict(zip(Article.SECTION, section)) for section in self.sections]
+        sections = [Article.BUILD_SECTION(section) for section in self.sections]
 
         # Add sections to article
         article["sections"] = sections
@@ -2,10 +2,18 @@
 CORD-19 tests
 """
 
+import csv
+import os
 import sqlite3
+import tempfile
+import unittest
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
 
 # pylint: disable=E0401
 from paperetl.cord19.execute import Execute
+from paperetl.schema.article import Article
 
 from testprocess import TestProcess
 from utils import Utils
@@ -84,3 +92,90 @@ class TestCord19(TestProcess):
                   "uqkiglu3": "daf55a623de742f6739a85993d3a0f9b"}
 
         self.sections(hashes)
+
+class TestCord19Parallel(TestCord19):
+    """
+    CORD-19 tests with rows processed through the process pool
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        One-time initialization. Run CORD-19 ETL process for the test dataset, forcing parallel processing.
+        """
+
+        # Build articles database
+        with patch.object(Execute, "MIN_PARALLEL", 0):
+            Execute.run(Utils.CORD19 + "/data", Utils.CORD19 + "/models", Utils.PATH + "/study", Utils.CORD19 + "/data/entry-dates.csv", True, None)
+
+class TestCord19Execute(unittest.TestCase):
+    """
+    CORD-19 row filtering tests
+    """
+
+    def testEntryDates(self):
+        """
+        Test blank lines in entry dates files are skipped
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "metadata.csv"), "w", newline="") as output:
+                output.write("cord_uid,sha,title,publish_time\nuid1,sha1,Title,2020-01-01\n")
+
+            with open(os.path.join(directory, "entry-dates.csv"), "w", newline="") as output:
+                output.write("sha,cord_uid,date\n\nsha1,uid1,2020-04-01\n\n")
+
+            self.assertEqual(Execute.entryDates(directory, None), {"uid1": "2020-04-01"})
+
+    def testRecent(self):
+        """
+        Test only recent and undated rows are processed and saved when not running a full database load
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            # Metadata rows - published before the tagging cutoff, undated and recent
+            rows = [("old", "sha1", "Old study", "2019-01-01"), ("undated", "sha2", "Undated study", ""),
+                    ("recent", "sha3", "Recent study", "2020-03-01")]
+
+            with open(os.path.join(directory, "metadata.csv"), "w", newline="") as output:
+                writer = csv.writer(output)
+                writer.writerow(["cord_uid", "sha", "title", "publish_time"])
+                writer.writerows(rows)
+
+            with open(os.path.join(directory, "entry-dates.csv"), "w", newline="") as output:
+                writer = csv.writer(output)
+                writer.writerow(["cord_uid", "sha", "date"])
+                writer.writerows([(uid, sha, "2020-04-01") for uid, sha, _, _ in rows])
+
+            # Mock row processing, returns a tagged article
+            process = MagicMock(side_effect=TestCord19Execute.process)
+
+            with patch.object(Execute, "process", process):
+                Execute.run(directory, directory, None, None, False, None)
+
+            # Rows published before the cutoff are never processed
+            self.assertEqual([params[0][0]["cord_uid"] for params, _ in process.call_args_list], ["undated", "recent"])
+
+            # Published dates are parsed once in stream and passed to process
+            self.assertEqual([params[0][4] for params, _ in process.call_args_list], [None, datetime(2020, 3, 1)])
+
+            db = sqlite3.connect(os.path.join(directory, "articles.sqlite"))
+            self.assertEqual([row[0] for row in db.execute("SELECT id FROM articles ORDER BY id")], ["recent", "undated"])
+            db.close()
+
+    @staticmethod
+    def process(params):
+        """
+        Mock row processing method.
+
+        Args:
+            params: (row, indir, models, entry date, published date)
+
+        Returns:
+            Article
+        """
+
+        row, _, _, entry, date = params
+
+        return Article((row["cord_uid"], None, date, None, None, row["title"], "COVID-19", None, None, None, None, None, entry),
+                       [], None)
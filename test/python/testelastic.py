@@ -0,0 +1,76 @@
+"""
+Elasticsearch tests
+"""
+
+import json
+import threading
+import unittest
+
+from unittest.mock import MagicMock, patch
+
+from elasticsearch.helpers import BulkIndexError
+from elasticsearch.serializer import JSONSerializer
+
+# pylint: disable=E0401
+from paperetl.elastic import Elastic
+from paperetl.schema.article import Article
+
+class TestElastic(unittest.TestCase):
+    """
+    Elasticsearch tests
+    """
+
+    def testIndexError(self):
+        """
+        Test failed bulk requests are raised while articles are being saved
+        """
+
+        with patch("paperetl.elastic.Elasticsearch") as elasticsearch:
+            connection = elasticsearch.return_value
+            connection.transport.serializer = JSONSerializer()
+            connection.bulk = MagicMock(side_effect=TestElastic.failed)
+
+            db = Elastic("http://localhost:9200")
+
+            saved = 0
+            with self.assertRaises(BulkIndexError):
+                for x in range(100000):
+                    db.save(Article((str(x),) + (None,) * 12, [], None))
+                    saved += 1
+
+            # Error raised well before all articles are saved
+            self.assertLess(saved, 50000)
+
+            # Complete must not hang waiting on the background thread
+            errors = []
+
+            def complete():
+                try:
+                    db.complete()
+                except BulkIndexError as ex:
+                    errors.append(ex)
+
+            thread = threading.Thread(target=complete, daemon=True)
+            thread.start()
+            thread.join(30)
+
+            self.assertFalse(thread.is_alive())
+            self.assertEqual(len(errors), 1)
+
+    @staticmethod
+    def failed(body, **kwargs):
+        """
+        Mock bulk request that fails every action.
+
+        Args:
+            body: bulk request body
+            kwargs: additional request arguments
+
+        Returns:
+            bulk response
+        """
+
+        # Action and source lines for each article
+        ids = [json.loads(line)["index"]["_id"] for line in body.strip().split("\n")[::2]]
+
+        return {"errors": True, "items": [{"index": {"_id": uid, "status": 400, "error": "failed"}} for uid in ids]}
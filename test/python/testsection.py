@@ -0,0 +1,32 @@
+"""
+CORD-19 section tests
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+# pylint: disable=E0401
+from paperetl.cord19.section import Section
+
+class TestSection(unittest.TestCase):
+    """
+    CORD-19 section tests
+    """
+
+    def testSurrogates(self):
+        """
+        Test JSON files with lone surrogate escapes are parsed
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            # Body text with a lone surrogate escape, which orjson rejects
+            with open(os.path.join(directory, "article.json"), "w") as output:
+                output.write('{"body_text": [{"section": "Results", "text": "Cases increased \\ud800 in all regions."}], '
+                             '"ref_entries": {}}')
+
+            row = {"title": None, "abstract": None, "pdf_json_files": "article.json", "pmc_json_files": None}
+            sections = Section.parse(row, directory)
+
+            self.assertEqual(sections, [("RESULTS", json.loads('"Cases increased \\ud800 in all regions."'))])